@@ -0,0 +1,93 @@
+/*
+ * Bomba de kernels OpenCL para o GPUStressor (carregada via ctypes).
+ *
+ * Mantem ate max_inflight kernels enfileirados, enfileirando o proximo assim
+ * que o mais antigo termina, ate *stop_flag virar 1. Roda fora do GIL: o
+ * Python so acompanha os contadores e vira a flag.
+ */
+#define CL_TARGET_OPENCL_VERSION 120
+#ifdef __APPLE__
+#include <OpenCL/opencl.h>
+#else
+#include <CL/cl.h>
+#endif
+
+#ifdef _WIN32
+#define PUMP_EXPORT __declspec(dllexport)
+#else
+#define PUMP_EXPORT
+#endif
+
+#define PUMP_MAX_INFLIGHT 16
+
+static void account_event(cl_event evt,
+                          volatile unsigned long long *completed,
+                          volatile unsigned long long *kernel_ns)
+{
+    cl_ulong t_start = 0, t_end = 0;
+
+    if (clGetEventProfilingInfo(evt, CL_PROFILING_COMMAND_START,
+                                sizeof(t_start), &t_start, NULL) == CL_SUCCESS &&
+        clGetEventProfilingInfo(evt, CL_PROFILING_COMMAND_END,
+                                sizeof(t_end), &t_end, NULL) == CL_SUCCESS) {
+        *kernel_ns += (unsigned long long)(t_end - t_start);
+    }
+    *completed += 1;
+    clReleaseEvent(evt);
+}
+
+/*
+ * Retorna CL_SUCCESS ao parar pela flag, ou o codigo de erro OpenCL.
+ * O kernel ja deve estar com os argumentos definidos (kernel.set_args).
+ */
+PUMP_EXPORT int pump_run(cl_command_queue queue,
+                         cl_kernel kernel,
+                         size_t global_size,
+                         size_t local_size,
+                         int max_inflight,
+                         volatile int *stop_flag,
+                         volatile unsigned long long *launched,
+                         volatile unsigned long long *completed,
+                         volatile unsigned long long *kernel_ns)
+{
+    cl_event ring[PUMP_MAX_INFLIGHT];
+    int head = 0, count = 0;
+    cl_int err = CL_SUCCESS;
+
+    if (max_inflight < 1)
+        max_inflight = 1;
+    if (max_inflight > PUMP_MAX_INFLIGHT)
+        max_inflight = PUMP_MAX_INFLIGHT;
+
+    while (!*stop_flag) {
+        if (count == max_inflight) {
+            err = clWaitForEvents(1, &ring[head]);
+            if (err != CL_SUCCESS)
+                break;
+            account_event(ring[head], completed, kernel_ns);
+            head = (head + 1) % max_inflight;
+            count--;
+        }
+
+        cl_event evt;
+        err = clEnqueueNDRangeKernel(queue, kernel, 1, NULL, &global_size,
+                                     local_size ? &local_size : NULL,
+                                     0, NULL, &evt);
+        if (err != CL_SUCCESS)
+            break;
+        clFlush(queue);
+
+        ring[(head + count) % max_inflight] = evt;
+        count++;
+        *launched += 1;
+    }
+
+    clFinish(queue);
+    while (count > 0) {
+        account_event(ring[head], completed, kernel_ns);
+        head = (head + 1) % max_inflight;
+        count--;
+    }
+
+    return (int)err;
+}
@@ -3,13 +3,19 @@ from __future__ import annotations
 """
 Módulo de estresse de GPU para o StressLab.
 
-Usa OpenCL (pyopencl) para gerar carga na GPU e nvidia-smi
-para limitar por temperatura, se disponível.
+Usa OpenCL (pyopencl) para gerar carga na GPU e NVML (pynvml) ou,
+na falta dele, nvidia-smi para limitar por temperatura, se disponível.
 """
 
+import atexit
+import ctypes
+import hashlib
+import platform
 import threading
 import time
 import subprocess
+from collections import deque
+from pathlib import Path
 from typing import Optional, Dict, Any
 
 try:
@@ -21,19 +27,162 @@ except ImportError as e:
         "Instale com: pip install pyopencl numpy"
     ) from e
 
+# NVML é opcional: consultas por chamada de biblioteca (<100 µs) em vez de
+# fork+exec do nvidia-smi a cada amostra. Sem ele, cai no nvidia-smi.
+try:
+    import pynvml
+    pynvml.nvmlInit()
+    _NVML_HANDLE = pynvml.nvmlDeviceGetHandleByIndex(0)
+    atexit.register(pynvml.nvmlShutdown)
+except Exception:
+    pynvml = None
+    _NVML_HANDLE = None
+
+
+# Bomba de kernels em C (_pump.c), opcional: compilada pelo usuário na mesma
+# pasta. Sem ela, o loop de despacho roda em Python.
+def _load_pump() -> Optional[ctypes.CDLL]:
+    names = {"Windows": "_pump.dll", "Darwin": "_pump.dylib"}
+    path = Path(__file__).resolve().parent / names.get(platform.system(), "_pump.so")
+    if not path.exists():
+        return None
+    try:
+        lib = ctypes.CDLL(str(path))
+        pump_run = lib.pump_run
+    except (OSError, AttributeError):
+        # Biblioteca ausente/incompatível ou sem pump_run: usa o loop em Python.
+        return None
+    pump_run.argtypes = [
+        ctypes.c_void_p,
+        ctypes.c_void_p,
+        ctypes.c_size_t,
+        ctypes.c_size_t,
+        ctypes.c_int,
+        ctypes.POINTER(ctypes.c_int),
+        ctypes.POINTER(ctypes.c_ulonglong),
+        ctypes.POINTER(ctypes.c_ulonglong),
+        ctypes.POINTER(ctypes.c_ulonglong),
+    ]
+    pump_run.restype = ctypes.c_int
+    return lib
+
+
+_PUMP = _load_pump()
+
+
+def _nvml_str(value: Any) -> str:
+    """pynvml antigo devolve bytes, versões novas devolvem str."""
+    if isinstance(value, bytes):
+        return value.decode("utf-8", errors="replace")
+    return str(value)
+
+# Quatro acumuladores float4 independentes com fma(): sem cadeia de dependência
+# serial, o escalonador emite uma FMA por ciclo por lane. Constantes distintas
+# impedem o compilador de fundir os acumuladores.
 KERNEL_SOURCE = """
 __kernel void burn(__global float *a, int iterations) {
     int gid = get_global_id(0);
-    float x = (float)(gid + 1);
+    float g = (float)gid;
+    float4 x0 = (float4)(g + 1.0f, g + 2.0f, g + 3.0f, g + 4.0f);
+    float4 x1 = (float4)(g + 5.0f, g + 6.0f, g + 7.0f, g + 8.0f);
+    float4 x2 = (float4)(g + 9.0f, g + 10.0f, g + 11.0f, g + 12.0f);
+    float4 x3 = (float4)(g + 13.0f, g + 14.0f, g + 15.0f, g + 16.0f);
+    const float4 c0 = (float4)(0.999999f);
+    const float4 c1 = (float4)(0.999998f);
+    const float4 c2 = (float4)(0.999997f);
+    const float4 c3 = (float4)(0.999996f);
+    const float4 d0 = (float4)(0.000001f);
+    const float4 d1 = (float4)(0.000002f);
+    const float4 d2 = (float4)(0.000003f);
+    const float4 d3 = (float4)(0.000004f);
     for (int i = 0; i < iterations; i++) {
-        x = x * 1.000001f + 0.000001f;
-        x = x * x + 1.0f;
+        x0 = fma(x0, c0, d0);
+        x1 = fma(x1, c1, d1);
+        x2 = fma(x2, c2, d2);
+        x3 = fma(x3, c3, d3);
     }
-    a[gid] = x;
+    // Todas as lanes de todos os acumuladores chegam à saída: nenhuma FMA
+    // contada em FLOPS_PER_ITER pode ser eliminada pelo compilador.
+    float4 s = x0 + x1 + x2 + x3;
+    a[gid] = s.s0 + s.s1 + s.s2 + s.s3;
 }
 """
+# 2 FLOPs (FMA) x 4 lanes (float4) x 4 acumuladores.
+FLOPS_PER_ITER = 2 * 4 * 4
+
+# Variante meia precisão (cl_khr_fp16) para medir throughput FP16.
+KERNEL_SOURCE_F16 = """
+#pragma OPENCL EXTENSION cl_khr_fp16 : enable
+__kernel void burn(__global half *a, int iterations) {
+    int gid = get_global_id(0);
+    half g = (half)(gid & 255);
+    half8 x0 = (half8)(g) + (half8)(1.0f, 2.0f, 3.0f, 4.0f, 5.0f, 6.0f, 7.0f, 8.0f);
+    half8 x1 = x0 + (half8)(8.0f);
+    half8 x2 = x1 + (half8)(8.0f);
+    half8 x3 = x2 + (half8)(8.0f);
+    const half8 c0 = (half8)(0.999f);
+    const half8 c1 = (half8)(0.998f);
+    const half8 c2 = (half8)(0.997f);
+    const half8 c3 = (half8)(0.996f);
+    const half8 d0 = (half8)(0.001f);
+    const half8 d1 = (half8)(0.002f);
+    const half8 d2 = (half8)(0.003f);
+    const half8 d3 = (half8)(0.004f);
+    for (int i = 0; i < iterations; i++) {
+        x0 = fma(x0, c0, d0);
+        x1 = fma(x1, c1, d1);
+        x2 = fma(x2, c2, d2);
+        x3 = fma(x3, c3, d3);
+    }
+    // Reduz as 8 lanes dos 4 acumuladores (ver KERNEL_SOURCE).
+    half8 s8 = x0 + x1 + x2 + x3;
+    half4 s4 = s8.lo + s8.hi;
+    half2 s2 = s4.lo + s4.hi;
+    a[gid] = s2.s0 + s2.s1;
+}
+"""
+# 2 FLOPs (FMA) x 8 lanes (half8) x 4 acumuladores.
+FLOPS_PER_ITER_F16 = 2 * 8 * 4
+
+DTYPES: dict[str, dict[str, int]] = {
+    "fp32": {
+        "itemsize": 4,
+        "flops_per_iter": FLOPS_PER_ITER,
+    },
+    "fp16": {
+        "itemsize": 2,
+        "flops_per_iter": FLOPS_PER_ITER_F16,
+    },
+}
+
+# Matemática relaxada: o compilador pode fundir x*c+d em MAD/FMA.
+CL_BUILD_OPTIONS = [
+    "-cl-fast-relaxed-math",
+    "-cl-mad-enable",
+    "-cl-no-signed-zeros",
+    "-cl-denorms-are-zero",
+]
+
+# Binários compilados ficam aqui para evitar o JIT do driver a cada execução.
+PROGRAM_CACHE_DIR = Path.home() / ".cache" / "stresslab"
 
 WORK_ITEMS_PER_CU = 65536
+# Teto do work-group escolhido automaticamente (arredondado ao múltiplo preferido).
+MAX_AUTO_LOCAL_SIZE = 256
+# Kernels enfileirados ao mesmo tempo no loop de estresse (a GPU nunca esvazia).
+MAX_INFLIGHT_KERNELS = 3
+# Pausa antes de repetir um benchmark que rodou com a GPU em throttling.
+THROTTLE_COOLDOWN_S = 2.0
+# Capacidade inicial dos arrays de histórico (dobra quando enche).
+HISTORY_INITIAL_CAPACITY = 256
+# Período (relógio) de amostragem de temperatura/utilização/throttling, igual
+# nos dois caminhos de despacho (loop Python e bomba em C).
+POLL_PERIOD_S = 0.25
+# As iterações dos perfis foram calibradas para o kernel escalar original
+# (4 FLOPs/iteração). Com os kernels vetoriais, cada iteração faz mais
+# trabalho: divide-se pelo fator para manter o tempo por lançamento (abaixo do
+# watchdog TDR de 2 s do Windows).
+PROFILE_FLOPS_PER_ITER = 4
 STRESS_PROFILES: dict[str, dict[str, int]] = {
     "leve": {
         "iterations": 50_000,
@@ -50,6 +199,31 @@ STRESS_PROFILES: dict[str, dict[str, int]] = {
 }
 
 
+def _scaled_iterations(iterations: int, flops_per_iter: int) -> int:
+    """Iterações do perfil reescaladas para um kernel com flops_per_iter FLOPs/iteração."""
+    return max(1, iterations * PROFILE_FLOPS_PER_ITER // flops_per_iter)
+
+
+# Lanes FP32 por compute unit, por fabricante (heurística para o pico teórico).
+# NVIDIA: SM com 128 lanes (Pascal, Ampere+; Volta/Turing têm 64).
+# AMD: CU com 64 lanes. Intel: compute unit = EU com 8 lanes.
+LANES_PER_CU_BY_VENDOR: dict[str, int] = {
+    "nvidia": 128,
+    "advanced micro devices": 64,
+    "amd": 64,
+    "intel": 8,
+}
+DEFAULT_LANES_PER_CU = 64
+
+
+def _lanes_per_cu(vendor: str) -> int:
+    vendor = vendor.lower()
+    for key, lanes in LANES_PER_CU_BY_VENDOR.items():
+        if key in vendor:
+            return lanes
+    return DEFAULT_LANES_PER_CU
+
+
 def get_gpu_specs() -> tuple[Dict[str, Any], "cl.Device"]:
     """Descobre a primeira GPU OpenCL disponível e retorna infos + device."""
     platforms = cl.get_platforms()
@@ -72,12 +246,28 @@ def get_gpu_specs() -> tuple[Dict[str, Any], "cl.Device"]:
         "compute_units": device.max_compute_units,
         "max_clock_mhz": device.max_clock_frequency,
         "global_mem_mb": device.global_mem_size // (1024 * 1024),
+        "vector_width_float": max(1, device.preferred_vector_width_float),
     }
+    info["lanes_per_cu"] = _lanes_per_cu(info["vendor"])
+    # Pico FP32 = CU * clock (GHz) * lanes/CU * 2 (FMA). A largura vetorial
+    # preferida é só uma dica do compilador (AMD reporta 4): não multiplica as
+    # lanes físicas.
+    info["peak_gflops"] = (
+        info["compute_units"] * info["max_clock_mhz"] / 1000
+        * info["lanes_per_cu"] * 2
+    )
     return info, device
 
 
 def get_gpu_temp() -> Optional[int]:
-    """Temperatura da GPU via nvidia-smi (em °C), ou None se indisponível."""
+    """Temperatura da GPU via NVML/nvidia-smi (em °C), ou None se indisponível."""
+    if _NVML_HANDLE is not None:
+        try:
+            return int(pynvml.nvmlDeviceGetTemperature(
+                _NVML_HANDLE, pynvml.NVML_TEMPERATURE_GPU
+            ))
+        except pynvml.NVMLError:
+            return None
     try:
         out = subprocess.check_output(
             [
@@ -95,7 +285,12 @@ def get_gpu_temp() -> Optional[int]:
 
 
 def get_gpu_util() -> Optional[int]:
-    """Utilização da GPU (%) via nvidia-smi, ou None se indisponível."""
+    """Utilização da GPU (%) via NVML/nvidia-smi, ou None se indisponível."""
+    if _NVML_HANDLE is not None:
+        try:
+            return int(pynvml.nvmlDeviceGetUtilizationRates(_NVML_HANDLE).gpu)
+        except pynvml.NVMLError:
+            return None
     try:
         out = subprocess.check_output(
             [
@@ -112,6 +307,86 @@ def get_gpu_util() -> Optional[int]:
         return None
 
 
+def get_gpu_temp_util() -> tuple[Optional[int], Optional[int]]:
+    """(temperatura °C, utilização %) numa única consulta NVML/nvidia-smi."""
+    if _NVML_HANDLE is not None:
+        return get_gpu_temp(), get_gpu_util()
+    try:
+        out = subprocess.check_output(
+            [
+                "nvidia-smi",
+                "--query-gpu=temperature.gpu,utilization.gpu",
+                "--format=csv,noheader,nounits",
+            ],
+            encoding="utf-8",
+            stderr=subprocess.DEVNULL,
+        )
+        temp, util = out.splitlines()[0].split(",")
+    except Exception:
+        return None, None
+
+    def _to_int(field: str) -> Optional[int]:
+        try:
+            return int(field.strip())
+        except ValueError:
+            return None
+
+    return _to_int(temp), _to_int(util)
+
+
+def get_gpu_driver_info() -> Optional[Dict[str, Any]]:
+    """Nome, memória total (MiB) e versão do driver via NVML, ou None."""
+    if _NVML_HANDLE is None:
+        return None
+    try:
+        return {
+            "name": _nvml_str(pynvml.nvmlDeviceGetName(_NVML_HANDLE)),
+            "mem_mb": pynvml.nvmlDeviceGetMemoryInfo(_NVML_HANDLE).total // (1024 * 1024),
+            "driver": _nvml_str(pynvml.nvmlSystemGetDriverVersion()),
+        }
+    except pynvml.NVMLError:
+        return None
+
+
+def get_gpu_throttled() -> Optional[bool]:
+    """True se a GPU está reduzindo clock por temperatura/slowdown (NVML), ou None."""
+    if _NVML_HANDLE is None:
+        return None
+    try:
+        reasons = pynvml.nvmlDeviceGetCurrentClocksThrottleReasons(_NVML_HANDLE)
+    except pynvml.NVMLError:
+        return None
+    mask = (
+        pynvml.nvmlClocksThrottleReasonHwSlowdown
+        | pynvml.nvmlClocksThrottleReasonSwThermalSlowdown
+        | pynvml.nvmlClocksThrottleReasonHwThermalSlowdown
+    )
+    return bool(reasons & mask)
+
+
+def _build_program(ctx: "cl.Context", device: "cl.Device", source: str) -> "cl.Program":
+    """Compila o programa, reutilizando o binário em cache quando possível."""
+    key = "\0".join([device.name, device.driver_version, source, *CL_BUILD_OPTIONS])
+    device_hash = hashlib.sha1(key.encode("utf-8")).hexdigest()
+    path = PROGRAM_CACHE_DIR / f"burn_{device_hash}.bin"
+
+    if path.exists():
+        try:
+            binary = path.read_bytes()
+            return cl.Program(ctx, [device], [binary]).build(options=CL_BUILD_OPTIONS)
+        except Exception:
+            pass  # binário inválido/incompatível: recompila do fonte
+
+    program = cl.Program(ctx, source).build(options=CL_BUILD_OPTIONS)
+    try:
+        binaries = program.get_info(cl.program_info.BINARIES)
+        PROGRAM_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(binaries[0])
+    except Exception:
+        pass
+    return program
+
+
 class GPUStressor:
     """Classe que gera carga na GPU usando OpenCL em um thread separado."""
 
@@ -125,12 +400,132 @@ class GPUStressor:
             self.ctx,
             properties=cl.command_queue_properties.PROFILING_ENABLE
         )
-        self.program = cl.Program(self.ctx, KERNEL_SOURCE).build()
+        self.program_fp32 = _build_program(self.ctx, device, KERNEL_SOURCE)
+        self.program_fp16: Optional["cl.Program"] = None
+        if "cl_khr_fp16" in device.extensions:
+            self.program_fp16 = _build_program(self.ctx, device, KERNEL_SOURCE_F16)
+
+        # Cada acesso a program.burn cria um kernel novo (clCreateKernel): busca uma
+        # vez só. O loop de estresse cria o seu uma vez por execução, pois define
+        # os argumentos e pode coexistir com o loop anterior ainda drenando.
+        self._kernels: dict[str, "cl.Kernel"] = {"fp32": self.program_fp32.burn}
+        if self.program_fp16 is not None:
+            self._kernels["fp16"] = self.program_fp16.burn
 
         self.running: bool = False
         self._thread: Optional[threading.Thread] = None
-        self.history: list[dict[str, float]] = []
+        self._stop_flag = ctypes.c_int(0)
+        # Cada start() gera um novo run_id: um loop antigo que ainda drena kernels
+        # após stop() não escreve no histórico nem encerra a execução nova.
+        self._run_id = 0
+        self._hist_lock = threading.Lock()
+        # Histórico em arrays NumPy (SoA): estatísticas em uma passada em C.
+        self._hist_len = 0
+        self._kernels_launched = 0
+        self._hist_t = np.empty(HISTORY_INITIAL_CAPACITY, dtype=np.float32)
+        self._hist_temp = np.empty(HISTORY_INITIAL_CAPACITY, dtype=np.float32)
+        self._hist_util = np.empty(HISTORY_INITIAL_CAPACITY, dtype=np.float32)
+        self._hist_kernel_ms = np.empty(HISTORY_INITIAL_CAPACITY, dtype=np.float32)
+        # 1.0 = throttling, 0.0 = normal, NaN = desconhecido (sem NVML).
+        self._hist_throttled = np.empty(HISTORY_INITIAL_CAPACITY, dtype=np.float32)
         self.profile: str = "medio"
+        # Só o buffer mais recente por itemsize: {itemsize: (work_items, buffer)}.
+        self._buf_cache: dict[int, tuple[int, "cl.Buffer"]] = {}
+
+        # Limites de work-group por programa: {dtype: (local automático, máximo)}.
+        self._local_limits: dict[str, tuple[int, int]] = {
+            dtype: self._query_local_limits(kernel)
+            for dtype, kernel in self._kernels.items()
+        }
+
+    def _query_local_limits(self, kernel: "cl.Kernel") -> tuple[int, int]:
+        """Escolhe o local size a partir do múltiplo preferido e do máximo do kernel."""
+        preferred = kernel.get_work_group_info(
+            cl.kernel_work_group_info.PREFERRED_WORK_GROUP_SIZE_MULTIPLE, self.device
+        )
+        max_wg = kernel.get_work_group_info(
+            cl.kernel_work_group_info.WORK_GROUP_SIZE, self.device
+        )
+        local = min(max_wg, MAX_AUTO_LOCAL_SIZE)
+        if preferred > 0 and local >= preferred:
+            local -= local % preferred
+        return max(1, local), max(1, max_wg)
+
+    def _dispatch_sizes(
+        self,
+        work_items: int,
+        dtype: str = "fp32",
+        local_size: Optional[int] = None,
+    ) -> tuple[int, int]:
+        """Retorna (global, local), com global arredondado para múltiplo do local.
+
+        local_size: override manual (None ou <= 0 = automático)
+        """
+        auto_local, max_wg = self._local_limits[dtype]
+        if local_size is None or local_size <= 0:
+            local = auto_local
+        else:
+            local = max(1, min(local_size, max_wg))
+        global_size = -(-work_items // local) * local
+        return global_size, local
+
+    def _get_buffer(self, work_items: int, itemsize: int = 4) -> "cl.Buffer":
+        """Buffer de saída do kernel, reutilizado enquanto work_items não mudar.
+
+        Guarda um único buffer por itemsize: ao mudar o tamanho, o anterior sai do
+        cache (memória fixada não se acumula). Um loop que ainda o use mantém a
+        própria referência até terminar.
+        """
+        cached = self._buf_cache.get(itemsize)
+        if cached is not None and cached[0] == work_items:
+            return cached[1]
+
+        # ALLOC_HOST_PTR: memória fixada (DMA rápido) em GPUs dedicadas e
+        # zero-copy em integradas, onde host e device dividem a DRAM.
+        buf = cl.Buffer(
+            self.ctx,
+            cl.mem_flags.WRITE_ONLY | cl.mem_flags.ALLOC_HOST_PTR,
+            work_items * itemsize,
+        )
+        self._buf_cache[itemsize] = (work_items, buf)
+        return buf
+
+    def _is_current(self, run_id: int) -> bool:
+        return self.running and self._run_id == run_id
+
+    def _record_launches(self, run_id: int, launched: int) -> None:
+        """Atualiza o total de kernels lançados da execução atual."""
+        with self._hist_lock:
+            if run_id == self._run_id:
+                self._kernels_launched = launched
+
+    def _hist_append(
+        self,
+        run_id: int,
+        t: float,
+        temp: float,
+        util: float,
+        kernel_ms: float,
+        throttled: Optional[bool],
+    ) -> None:
+        """Grava uma amostra no histórico, dobrando os arrays se necessário."""
+        with self._hist_lock:
+            if run_id != self._run_id:
+                return
+            i = self._hist_len
+            if i == self._hist_t.shape[0]:
+                cap = 2 * i
+                self._hist_t = np.resize(self._hist_t, cap)
+                self._hist_temp = np.resize(self._hist_temp, cap)
+                self._hist_util = np.resize(self._hist_util, cap)
+                self._hist_kernel_ms = np.resize(self._hist_kernel_ms, cap)
+                self._hist_throttled = np.resize(self._hist_throttled, cap)
+            self._hist_t[i] = t
+            self._hist_temp[i] = temp
+            self._hist_util[i] = util
+            self._hist_kernel_ms[i] = kernel_ms
+            self._hist_throttled[i] = float(throttled) if throttled is not None else float("nan")
+            self._hist_len = i + 1
 
 
     def start(
@@ -139,12 +534,14 @@ class GPUStressor:
         max_temp: Optional[int],
         active_units: Optional[int] = None,
         profile: str = "medio",
+        local_size: Optional[int] = None,
     ) -> None:
         """Inicia o estresse de GPU.
 
         duration_s: tempo máximo de execução (maior que 0)
         max_temp: temperatura máxima em °C (None = ignora)
         active_units: número de compute units lógicos a usar
+        local_size: tamanho do work-group (None = automático)
         """
         if self.running:
             return
@@ -160,10 +557,23 @@ class GPUStressor:
         
         self.profile = profile
         
+        # Sem join(): o loop anterior pode continuar drenando kernels em voo. Ele
+        # fica com o próprio run_id e a própria flag (já em 1) e apenas sai.
+        with self._hist_lock:
+            self._run_id += 1
+            run_id = self._run_id
+            self._hist_len = 0
+            self._kernels_launched = 0
+        stop_flag = ctypes.c_int(0)
+        self._stop_flag = stop_flag
+
         self.running = True
         self._thread = threading.Thread(
             target=self._stress_loop,
-            args=(float(duration_s), max_temp, active_units, profile),
+            args=(
+                run_id, stop_flag,
+                float(duration_s), max_temp, active_units, profile, local_size,
+            ),
             daemon=True,
         )
         self._thread.start()
@@ -171,78 +581,212 @@ class GPUStressor:
     def stop(self) -> None:
         """Pede para parar o estresse."""
         self.running = False
+        self._stop_flag.value = 1
 
     def _stress_loop(
         self,
+        run_id: int,
+        stop_flag: ctypes.c_int,
         duration_s: float,
         max_temp: Optional[int],
         active_units: int,
-        profile:str
+        profile:str,
+        local_size: Optional[int] = None,
     ) -> None:
         
         preset = STRESS_PROFILES.get(profile, STRESS_PROFILES["medio"])
         work_items_factor = preset["work_items_factor"]
-        iterations_value = preset["iterations"]
+        iterations_value = _scaled_iterations(preset["iterations"], FLOPS_PER_ITER)
 
-        work_items = active_units * WORK_ITEMS_PER_CU * work_items_factor
+        work_items, local = self._dispatch_sizes(
+            active_units * WORK_ITEMS_PER_CU * work_items_factor,
+            local_size=local_size,
+        )
         iterations = np.int32(iterations_value)
 
-        a = np.empty(work_items, dtype=np.float32)
-        buf = cl.Buffer(self.ctx, cl.mem_flags.WRITE_ONLY, a.nbytes)
+        buf = self._get_buffer(work_items)
+        kernel = self.program_fp32.burn
+        kernel.set_args(buf, iterations)
 
-        self.history.clear()
+        inflight: deque["cl.Event"] = deque()
+        launches = 0
+        kernel_ns_acc = 0
+        kernel_count = 0
         start = time.time()
+        last_poll = start
 
         try:
-            while self.running:
+            if _PUMP is not None:
+                self._native_pump_loop(
+                    run_id, stop_flag, kernel, duration_s, max_temp, work_items, local
+                )
+                return
+
+            while self._is_current(run_id):
                 now = time.time()
                 if duration_s > 0 and (now - start) >= duration_s:
                     break
 
-                if max_temp is not None:
-                    t = get_gpu_temp()
-                    if t is not None and t >= max_temp:
-                        print(f"[GPUStressor] Parando: temperatura {t}°C >= {max_temp}°C")
-                        break
-
-                evt = self.program.burn(
-                    self.queue,
-                    (work_items,),
-                    None,
-                    buf,
-                    iterations,
+                evt = cl.enqueue_nd_range_kernel(
+                    self.queue, kernel, (work_items,), (local,)
                 )
-                evt.wait()
+                inflight.append(evt)
+                launches += 1
 
-                elapsed = time.time() - start
-                temp = get_gpu_temp()
-                util = get_gpu_util()
+                if len(inflight) >= MAX_INFLIGHT_KERNELS:
+                    done = inflight.popleft()
+                    done.wait()
+                    # Duração medida pelo timer do device (ns), sem jitter do host.
+                    kernel_ns_acc += done.profile.end - done.profile.start
+                    kernel_count += 1
 
-                self.history.append({
-                    "t": elapsed,
-                    "temp": float(temp) if temp is not None else float("nan"),
-                    "util": float(util) if util is not None else float("nan"),
-                })
+                now = time.time()
+                if now - last_poll < POLL_PERIOD_S:
+                    continue
+                last_poll = now
+                self._record_launches(run_id, launches)
+
+                elapsed = now - start
+                temp, util = get_gpu_temp_util()
+                throttled = get_gpu_throttled()
+                kernel_ms = (
+                    kernel_ns_acc / kernel_count / 1e6 if kernel_count else float("nan")
+                )
+                kernel_ns_acc = 0
+                kernel_count = 0
+
+                self._hist_append(
+                    run_id,
+                    elapsed,
+                    float(temp) if temp is not None else float("nan"),
+                    float(util) if util is not None else float("nan"),
+                    kernel_ms,
+                    throttled,
+                )
+
+                if max_temp is not None and temp is not None and temp >= max_temp:
+                    print(f"[GPUStressor] Parando: temperatura {temp}°C >= {max_temp}°C")
+                    break
 
         except Exception as e:
             print("[GPUStressor] Erro no loop:", e)
         finally:
-            self.running = False
+            try:
+                cl.enqueue_barrier(self.queue)
+                self.queue.finish()
+            except Exception:
+                pass
+            inflight.clear()
+            if _PUMP is None:
+                self._record_launches(run_id, launches)
+            if self._run_id == run_id:
+                self.running = False
             print("[GPUStressor] Loop de estresse finalizado.")
     
+    def _native_pump_loop(
+        self,
+        run_id: int,
+        stop_flag: ctypes.c_int,
+        kernel: "cl.Kernel",
+        duration_s: float,
+        max_temp: Optional[int],
+        work_items: int,
+        local: int,
+    ) -> None:
+        """Despacha os kernels pela bomba em C (sem GIL) e só amostra em Python.
+
+        kernel: já com os argumentos definidos
+        """
+        launched = ctypes.c_ulonglong(0)
+        completed = ctypes.c_ulonglong(0)
+        kernel_ns = ctypes.c_ulonglong(0)
+        err: list[int] = []
+
+        def _pump() -> None:
+            err.append(_PUMP.pump_run(
+                self.queue.int_ptr,
+                kernel.int_ptr,
+                work_items,
+                local,
+                MAX_INFLIGHT_KERNELS,
+                ctypes.byref(stop_flag),
+                ctypes.byref(launched),
+                ctypes.byref(completed),
+                ctypes.byref(kernel_ns),
+            ))
+
+        pump_thread = threading.Thread(target=_pump, daemon=True)
+        pump_thread.start()
+
+        last_completed = 0
+        last_ns = 0
+        start = time.time()
+
+        try:
+            while self._is_current(run_id) and pump_thread.is_alive():
+                time.sleep(POLL_PERIOD_S)
+
+                elapsed = time.time() - start
+                if duration_s > 0 and elapsed >= duration_s:
+                    break
+
+                temp, util = get_gpu_temp_util()
+                throttled = get_gpu_throttled()
+                done, ns = completed.value, kernel_ns.value
+                kernel_ms = (
+                    (ns - last_ns) / (done - last_completed) / 1e6
+                    if done > last_completed else float("nan")
+                )
+                last_completed, last_ns = done, ns
+                self._record_launches(run_id, launched.value)
+
+                self._hist_append(
+                    run_id,
+                    elapsed,
+                    float(temp) if temp is not None else float("nan"),
+                    float(util) if util is not None else float("nan"),
+                    kernel_ms,
+                    throttled,
+                )
+
+                if max_temp is not None and temp is not None and temp >= max_temp:
+                    print(f"[GPUStressor] Parando: temperatura {temp}°C >= {max_temp}°C")
+                    break
+        finally:
+            stop_flag.value = 1
+            pump_thread.join()
+            self._record_launches(run_id, launched.value)
+            if err and err[0] != 0:
+                print(f"[GPUStressor] Erro OpenCL na bomba nativa: {err[0]}")
+
     def benchmark_once(
         self,
         profile: str = "medio",
         active_units: Optional[int] = None,
+        dtype: str = "fp32",
+        local_size: Optional[int] = None,
     ) -> dict[str, float]:
-        """Roda o kernel uma vez e calcula throughput em GFLOPs baseado no perfil."""
+        """Roda o kernel uma vez e calcula throughput em GFLOPs baseado no perfil.
+
+        dtype: "fp32" ou "fp16" (requer cl_khr_fp16 no device)
+        local_size: tamanho do work-group (None = automático)
+        """
 
         profile = profile.lower()
         if profile not in STRESS_PROFILES:
             profile = "medio"
 
+        dtype = dtype.lower()
+        if dtype not in DTYPES:
+            dtype = "fp32"
+
+        if dtype not in self._kernels:
+            raise RuntimeError("GPU não suporta FP16 (cl_khr_fp16).")
+        kernel = self._kernels[dtype]
+        dtype_info = DTYPES[dtype]
+
         preset = STRESS_PROFILES[profile]
-        iterations = preset["iterations"]
+        iterations = _scaled_iterations(preset["iterations"], dtype_info["flops_per_iter"])
         work_items_factor = preset["work_items_factor"]
 
         if active_units is None or active_units <= 0:
@@ -250,56 +794,98 @@ class GPUStressor:
 
         active_units = max(1, min(active_units, self.info["compute_units"]))
 
-        work_items = active_units * WORK_ITEMS_PER_CU * work_items_factor
+        work_items, local = self._dispatch_sizes(
+            active_units * WORK_ITEMS_PER_CU * work_items_factor,
+            dtype=dtype,
+            local_size=local_size,
+        )
 
         iterations32 = np.int32(iterations)
 
-        a = np.empty(work_items, dtype=np.float32)
-        buf = cl.Buffer(self.ctx, cl.mem_flags.WRITE_ONLY, a.nbytes)
+        buf = self._get_buffer(work_items, dtype_info["itemsize"])
 
-        evt = self.program.burn(
-            self.queue,
-            (work_items,),
-            None,
-            buf,
-            iterations32,
-        )
-        evt.wait()
+        kernel.set_args(buf, iterations32)
 
-        elapsed_ns = evt.profile.end - evt.profile.start
-        elapsed_s = elapsed_ns / 1e9
+        def _run() -> float:
+            evt = cl.enqueue_nd_range_kernel(
+                self.queue, kernel, (work_items,), (local,)
+            )
+            evt.wait()
+            return (evt.profile.end - evt.profile.start) / 1e9
 
-        flops_per_iter = 4
-        total_flops = work_items * iterations * flops_per_iter
-        gflops = (total_flops / 1e9) / elapsed_s
+        total_flops = work_items * iterations * dtype_info["flops_per_iter"]
 
-        return {
+        elapsed_s = _run()
+        throttled = get_gpu_throttled()
+        throttled_gflops: Optional[float] = None
+
+        if throttled:
+            # Amostra sob throttling não é confiável: esfria e repete uma vez.
+            throttled_gflops = (total_flops / 1e9) / elapsed_s
+            time.sleep(THROTTLE_COOLDOWN_S)
+            elapsed_s = _run()
+            throttled = get_gpu_throttled()
+
+        gflops = (total_flops / 1e9) / elapsed_s
+        # Pico do device inteiro: active_units só reduz o global size, o runtime
+        # continua distribuindo os work-groups por todas as CUs. O pico é FP32,
+        # então a utilização só vale para fp32.
+        peak_gflops = self.info["peak_gflops"]
+        utilization_pct = float("nan")
+        if dtype == "fp32" and peak_gflops > 0:
+            utilization_pct = gflops / peak_gflops * 100
+
+        result = {
             "elapsed_s": elapsed_s,
             "gflops": gflops,
+            "peak_gflops": peak_gflops,
+            "utilization_pct": utilization_pct,
             "work_items": float(work_items),
+            "local_size": float(local),
             "iterations": float(iterations),
+            # NaN = não medido (sem NVML).
+            "throttled": float(throttled) if throttled is not None else float("nan"),
         }
+        if throttled_gflops is not None:
+            result["throttled_gflops"] = throttled_gflops
+        return result
 
 
     def summary(self) -> dict[str, Any]:
         """Resumo simples da última execução."""
-        if not self.history:
-            return {}
-
-        temps = [h["temp"] for h in self.history if not np.isnan(h["temp"])]
-        utils = [h["util"] for h in self.history if not np.isnan(h["util"])]
+        with self._hist_lock:
+            n = self._hist_len
+            if n == 0:
+                return {}
+            t_last = float(self._hist_t[n - 1])
+            kernels_launched = self._kernels_launched
+            temps = self._hist_temp[:n].copy()
+            utils = self._hist_util[:n].copy()
+            kernel_ms = self._hist_kernel_ms[:n].copy()
+            throttled_raw = self._hist_throttled[:n].copy()
+
+        # Throughput (util/kernel) ignora amostras em throttling; temperatura não.
+        throttled = throttled_raw == 1.0
+        utils = utils[~throttled]
+        kernel_ms = kernel_ms[~throttled]
 
         def _stats(xs):
-            if not xs:
+            if xs.size == 0 or np.isnan(xs).all():
                 return {"min": float("nan"), "max": float("nan"), "avg": float("nan")}
             return {
-                "min": float(np.min(xs)),
-                "max": float(np.max(xs)),
-                "avg": float(np.mean(xs)),
+                "min": float(np.nanmin(xs)),
+                "max": float(np.nanmax(xs)),
+                "avg": float(np.nanmean(xs)),
             }
 
         return {
             "temp": _stats(temps),
             "util": _stats(utils),
-            "duration_s": self.history[-1]["t"],
+            "kernel_time_ms": _stats(kernel_ms),
+            "throttled_fraction": (
+                float(np.nanmean(throttled_raw))
+                if not np.isnan(throttled_raw).all() else float("nan")
+            ),
+            "duration_s": t_last,
+            "kernels_launched": kernels_launched,
         }
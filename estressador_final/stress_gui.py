@@ -11,25 +11,33 @@ import time
 import psutil
 import shutil
 import platform
+import glob
+from collections import deque
 from typing import Optional
-import math
+import numpy as np
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
 
 try:
-    from gpu_stressor import GPUStressor, get_gpu_temp, get_gpu_util
+    from gpu_stressor import GPUStressor, get_gpu_temp_util, get_gpu_driver_info
     GPU_BACKEND_AVAILABLE = True
 except Exception:
     GPUStressor = None
     GPU_BACKEND_AVAILABLE = False
 
-    def get_gpu_temp() -> Optional[int]:
-        return None
+    def get_gpu_temp_util() -> tuple[Optional[int], Optional[int]]:
+        return None, None
 
-    def get_gpu_util() -> Optional[int]:
+    def get_gpu_driver_info() -> Optional[dict]:
         return None
 
 
+# Janela de tempo mantida em memória (ring buffer) e pontos máximos por curva no
+# gráfico. O tamanho do ring sai de _sample_period.
+SAMPLE_HISTORY_WINDOW_S = 3600
+MAX_PLOT_POINTS = 2000
+
+
 class StressGUI:
     def __init__(self, root: tk.Tk) -> None:
         self.root = root
@@ -41,19 +49,30 @@ class StressGUI:
         self.temp_limit_var = tk.IntVar(value=85)
         self.progress_var = tk.IntVar(value=0)
         self.profile_var = tk.StringVar(value="medio")
+        self.dtype_var = tk.StringVar(value="fp32")
+        self.local_size_var = tk.IntVar(value=0)
 
         self.process: Optional[subprocess.Popen] = None
-        self.gpu_stressor: Optional[GPUStressor] = GPUStressor() if GPU_BACKEND_AVAILABLE else None
+        # Criado em background (_init_gpu_backend): o build OpenCL pode levar segundos.
+        self.gpu_stressor: Optional[GPUStressor] = None
 
         self.running = False
         self.start_time: float = 0.0
         self.current_duration: int = 0
+        self._sample_period: float = 0.25
+        self._hwmon_temp_paths: list[str] = self._probe_hwmon_temp_paths()
+        self._gpu_info_str: str = self._query_gpu_info_str()
 
         self._build_ui()
         self._on_mode_change()
         self._update_system_info()
 
-        self.sample_history: list[dict] = []
+        self.sample_history: deque[dict] = deque(
+            maxlen=int(SAMPLE_HISTORY_WINDOW_S / self._sample_period)
+        )
+
+        if GPU_BACKEND_AVAILABLE:
+            threading.Thread(target=self._init_gpu_backend, daemon=True).start()
 
 
     def _build_ui(self) -> None:
@@ -70,8 +89,7 @@ class StressGUI:
             command=self._on_mode_change
         )
         self.gpu_radio.pack(side="left", padx=5, pady=5)
-        if not GPU_BACKEND_AVAILABLE:
-            self.gpu_radio.config(state="disabled")
+        self.gpu_radio.config(state="disabled")
 
         params_frame = ttk.LabelFrame(self.root, text="Parâmetros")
         params_frame.pack(fill="x", padx=10, pady=5)
@@ -105,6 +123,23 @@ class StressGUI:
         self.profile_combo.grid(row=3, column=1, sticky="w", padx=5, pady=2)
         self.profile_combo.current(1)
 
+        self.dtype_combo = ttk.Combobox(
+            params_frame,
+            textvariable=self.dtype_var,
+            values=("fp32", "fp16"),
+            state="readonly",
+            width=6,
+        )
+        self.dtype_combo.grid(row=3, column=2, sticky="w", padx=5, pady=2)
+        self.dtype_combo.current(0)
+
+        ttk.Label(params_frame, text="Local size GPU (0 = auto):").grid(row=4, column=0, sticky="w", padx=5, pady=2)
+        self.local_size_spin = ttk.Spinbox(
+            params_frame, from_=0, to=1024,
+            textvariable=self.local_size_var, width=5
+        )
+        self.local_size_spin.grid(row=4, column=1, sticky="w", padx=5, pady=2)
+
         info_frame = ttk.LabelFrame(self.root, text="Informações do sistema")
         info_frame.pack(fill="x", padx=10, pady=5)
 
@@ -140,12 +175,27 @@ class StressGUI:
 
         self.benchmark_btn = ttk.Button(btn_frame, text="Benchmark GPU", command=self.run_gpu_benchmark)
         self.benchmark_btn.pack(side="left", padx=5)
-        if not GPU_BACKEND_AVAILABLE:
-            self.benchmark_btn.config(state="disabled")
+        self.benchmark_btn.config(state="disabled")
 
         self.show_graph_btn = ttk.Button(btn_frame, text="Mostrar gráfico", command=self.show_graph)
         self.show_graph_btn.pack(side="left", padx=5)
 
+    def _init_gpu_backend(self) -> None:
+        """Roda em thread separada: compila o kernel e faz um warmup curto."""
+        try:
+            stressor = GPUStressor()
+            stressor.benchmark_once(profile="leve", active_units=1)
+        except Exception as e:
+            print("[StressGUI] Backend de GPU indisponível:", e)
+            return
+        self.root.after(0, self._enable_gpu_controls, stressor)
+
+    def _enable_gpu_controls(self, stressor: GPUStressor) -> None:
+        self.gpu_stressor = stressor
+        self.gpu_radio.config(state="normal")
+        self.benchmark_btn.config(state="normal")
+        self._on_mode_change()
+
     def show_graph(self) -> None:
         if not self.sample_history:
             messagebox.showinfo("Sem dados", "Nenhuma amostra disponível para plotar.")
@@ -157,11 +207,17 @@ class StressGUI:
 
         fig = Figure(figsize=(9, 6), dpi=100)
 
-        ts = [s["t"] for s in self.sample_history]
-        cpu_vals = [s["cpu"] for s in self.sample_history]
-        gpu_vals = [s["gpu"] for s in self.sample_history]
-        cpu_temps = [s["cpu_temp"] for s in self.sample_history]
-        gpu_temps = [s["gpu_temp"] for s in self.sample_history]
+        # Uma passada sobre as amostras -> colunas NumPy (NaN já marca ausência).
+        samples = list(self.sample_history)
+        data = np.array(
+            [(s["t"], s["cpu"], s["gpu"], s["cpu_temp"], s["gpu_temp"])
+             for s in samples],
+            dtype=np.float64,
+        )
+        if len(data) > MAX_PLOT_POINTS:
+            # Divisão com teto: o passo garante no máximo MAX_PLOT_POINTS pontos.
+            data = data[::-(-len(data) // MAX_PLOT_POINTS)]
+        ts, cpu_vals, gpu_vals, cpu_temps, gpu_temps = data.T
 
         ax1 = fig.add_subplot(211)
         ax1.plot(ts, cpu_vals, label="CPU %", marker=None)
@@ -172,11 +228,8 @@ class StressGUI:
         ax1.legend(loc="upper right")
 
         ax2 = fig.add_subplot(212)
-        def sanitize(xs):
-            return [x if (x is not None and not math.isnan(x)) else float("nan") for x in xs]
-
-        ax2.plot(ts, sanitize(cpu_temps), label="Temp CPU (°C)")
-        ax2.plot(ts, sanitize(gpu_temps), label="Temp GPU (°C)")
+        ax2.plot(ts, cpu_temps, label="Temp CPU (°C)")
+        ax2.plot(ts, gpu_temps, label="Temp GPU (°C)")
         ax2.set_ylabel("Temperatura (°C)")
         ax2.set_xlabel("Tempo (s)")
         ax2.grid(True, linestyle="--", alpha=0.4)
@@ -209,6 +262,17 @@ class StressGUI:
                  f"Lógicos: {cores_logical} | Freq: {freq_str}"
         )
 
+        self.gpu_info_label.config(text=self._gpu_info_str)
+
+    def _query_gpu_info_str(self) -> str:
+        """Consulta única (NVML, ou nvidia-smi como fallback) feita na inicialização."""
+        nvml_info = get_gpu_driver_info()
+        if nvml_info is not None:
+            return (
+                f"GPU: {nvml_info['name']} | Mem: {nvml_info['mem_mb']} MiB | "
+                f"Driver: {nvml_info['driver']}"
+            )
+
         gpu_text = "GPU: não encontrada / nvidia-smi indisponível"
         if shutil.which("nvidia-smi"):
             try:
@@ -223,8 +287,7 @@ class StressGUI:
                     gpu_text = f"GPU: {name} | Mem: {mem} | Driver: {driver}"
             except Exception as e:
                 gpu_text = f"GPU: erro ao consultar ({e})"
-
-        self.gpu_info_label.config(text=gpu_text)
+        return gpu_text
 
 
     def _on_mode_change(self) -> None:
@@ -303,7 +366,8 @@ class StressGUI:
                 duration_s=float(duration),
                 max_temp=temp_limit,
                 active_units=units,
-                profile=profile
+                profile=profile,
+                local_size=self.local_size_var.get(),
             )
 
         self.running = True
@@ -355,27 +419,101 @@ class StressGUI:
                 )
                 return
 
-            try:
-                profile = self.profile_var.get()
-                active_units = self.cpu_cores_var.get()
-                result = self.gpu_stressor.benchmark_once(profile=profile, active_units=active_units)
-            except Exception as e:
-                messagebox.showerror(
-                    "Erro no benchmark",
-                    f"Ocorreu um erro ao executar o benchmark da GPU:\n{e}",
-                )
-                return
+            # Lê os parâmetros aqui (variáveis Tk só no thread principal) e roda o
+            # benchmark em background: kernel + cool-down de throttling levam segundos.
+            params = {
+                "profile": self.profile_var.get(),
+                "active_units": self.cpu_cores_var.get(),
+                "dtype": self.dtype_var.get(),
+                "local_size": self.local_size_var.get(),
+            }
+            stressor = self.gpu_stressor
+            self.benchmark_btn.config(state="disabled")
+
+            def worker() -> None:
+                try:
+                    result = stressor.benchmark_once(**params)
+                except Exception as e:
+                    self.root.after(0, self._show_gpu_benchmark_error, e)
+                    return
+                self.root.after(0, self._show_gpu_benchmark_result, params["dtype"], result)
+
+            threading.Thread(target=worker, daemon=True).start()
+
+    def _show_gpu_benchmark_error(self, e: Exception) -> None:
+        self.benchmark_btn.config(state="normal")
+        messagebox.showerror(
+            "Erro no benchmark",
+            f"Ocorreu um erro ao executar o benchmark da GPU:\n{e}",
+        )
 
-            name = self.gpu_stressor.info.get("name", "Desconhecida")
-            msg = (
-                f"GPU: {name}\n"
-                f"Work-items: {result['work_items']}\n"
-                f"Iterações: {result['iterations']}\n"
-                f"Tempo: {result['elapsed_s']:.4f} s\n"
-                f"Throughput estimado: {result['gflops']:.2f} GFLOPs"
+    def _show_gpu_benchmark_result(self, dtype: str, result: dict) -> None:
+        self.benchmark_btn.config(state="normal")
+        name = self.gpu_stressor.info.get("name", "Desconhecida")
+        msg = (
+            f"GPU: {name}\n"
+            f"Precisão: {dtype.upper()}\n"
+            f"Work-items: {result['work_items']} (local {result['local_size']:.0f})\n"
+            f"Iterações: {result['iterations']}\n"
+            f"Tempo: {result['elapsed_s']:.4f} s\n"
+            f"Throughput estimado: {result['gflops']:.2f} GFLOPs\n"
+            f"Pico teórico FP32: {result['peak_gflops']:.2f} GFLOPs"
+        )
+        if dtype == "fp32":
+            msg += f" ({result['utilization_pct']:.1f}% do pico)"
+        else:
+            msg += " (referência FP32; utilização não se aplica a FP16)"
+        if "throttled_gflops" in result:
+            msg += (
+                f"\n\n1ª execução com throttling: {result['throttled_gflops']:.2f} GFLOPs "
+                "(repetida após resfriar)"
             )
-            messagebox.showinfo("Benchmark GPU", msg)
+        if result.get("throttled") == 1.0:
+            msg += "\nAviso: GPU em throttling durante a medição."
+        messagebox.showinfo("Benchmark GPU", msg)
+
+
+    def _probe_hwmon_temp_paths(self) -> list[str]:
+        """No Linux, lista uma vez os arquivos tempY_input do hwmon (a lista é estática)."""
+        if platform.system() != "Linux":
+            return []
+        try:
+            if not psutil.sensors_temperatures():
+                return []
+        except Exception:
+            return []
+
+        paths = []
+        for path in sorted(glob.glob("/sys/class/hwmon/hwmon*/temp*_input")):
+            try:
+                with open(path) as f:
+                    int(f.read())
+            except (OSError, ValueError):
+                continue
+            paths.append(path)
+        return paths
+
+    def _read_max_cpu_temp(self) -> Optional[float]:
+        """Maior temperatura entre os sensores, lendo direto do hwmon quando possível."""
+        if self._hwmon_temp_paths:
+            values = []
+            for path in self._hwmon_temp_paths:
+                try:
+                    with open(path) as f:
+                        values.append(int(f.read()) / 1000.0)
+                except (OSError, ValueError):
+                    continue
+            return max(values) if values else None
 
+        try:
+            temps = psutil.sensors_temperatures()
+            if temps:
+                all_temps = [t.current for arr in temps.values() for t in arr]
+                if all_temps:
+                    return max(all_temps)
+        except Exception:
+            pass
+        return None
 
     def _monitor_loop(self) -> None:
         """Roda em thread separada: atualiza progresso, uso CPU, GPU e limites."""
@@ -383,26 +521,25 @@ class StressGUI:
         temp_limit = self.temp_limit_var.get()
         mode = self.mode.get()
 
+        # cpu_percent(interval=None) não bloqueia: devolve o uso desde a última chamada.
+        psutil.cpu_percent(interval=None)
+
         while self.running:
-            elapsed = int(time.time() - self.start_time)
-            self.root.after(0, self.progress_var.set, min(elapsed, duration))
+            time.sleep(self._sample_period)
+            if not self.running:
+                return
 
-            cpu_usage = psutil.cpu_percent(interval=1)
+            elapsed = time.time() - self.start_time
+            progress = min(int(elapsed), duration)
+
+            cpu_usage = psutil.cpu_percent(interval=None)
 
             temp_str = "N/D"
-            max_cpu_temp = None
-            try:
-                temps = psutil.sensors_temperatures()
-                if temps:
-                    all_temps = [t.current for arr in temps.values() for t in arr]
-                    if all_temps:
-                        max_cpu_temp = max(all_temps)
-                        temp_str = f"{max_cpu_temp:.1f} °C"
-            except Exception:
-                pass
+            max_cpu_temp = self._read_max_cpu_temp()
+            if max_cpu_temp is not None:
+                temp_str = f"{max_cpu_temp:.1f} °C"
 
-            gpu_temp = get_gpu_temp()
-            gpu_util = get_gpu_util()
+            gpu_temp, gpu_util = get_gpu_temp_util()
             gpu_temp_str = f"{gpu_temp} °C" if gpu_temp is not None else "N/D"
             gpu_util_str = f"{gpu_util} %" if gpu_util is not None else "N/D"
             
@@ -418,37 +555,49 @@ class StressGUI:
                 f"Uso CPU: {cpu_usage:.1f}% | Temp CPU: {temp_str} | "
                 f"GPU Util: {gpu_util_str} | Temp GPU: {gpu_temp_str}"
             )
-            self.root.after(0, self.runtime_label.config, {"text": txt})
+            reason = self._check_stop_reason(
+                mode, elapsed, duration, temp_limit, max_cpu_temp, gpu_temp
+            )
+
+            # Um único callback por tick: progresso, rótulo e (se for o caso) o fim.
+            def ui_update(progress=progress, txt=txt, reason=reason) -> None:
+                self.progress_var.set(progress)
+                self.runtime_label.config(text=txt)
+                if reason is not None:
+                    self._finish_due_to_limit(reason)
 
-            if elapsed >= duration:
-                self.root.after(0, self._finish_due_to_limit, "Tempo limite alcançado.")
+            self.root.after(0, ui_update)
+            if reason is not None:
                 return
 
-            if mode == "cpu":
-                if max_cpu_temp is not None and max_cpu_temp >= temp_limit:
-                    reason = f"Temperatura CPU limite atingida ({max_cpu_temp:.1f} °C)."
-                    self.root.after(0, self._finish_due_to_limit, reason)
-                    return
-            else:
-                if gpu_temp is not None and gpu_temp >= temp_limit:
-                    reason = f"Temperatura GPU limite atingida ({gpu_temp:.1f} °C)."
-                    self.root.after(0, self._finish_due_to_limit, reason)
-                    return
+    def _check_stop_reason(
+        self,
+        mode: str,
+        elapsed: float,
+        duration: int,
+        temp_limit: int,
+        max_cpu_temp: Optional[float],
+        gpu_temp: Optional[int],
+    ) -> Optional[str]:
+        """Motivo para encerrar o estresse neste tick, ou None para continuar."""
+        if elapsed >= duration:
+            return "Tempo limite alcançado."
 
-            if mode == "cpu":
-                if self.process and self.process.poll() is not None:
-                    self.root.after(
-                        0, self._finish_due_to_limit,
-                        "Processo CPU terminou antes do tempo."
-                    )
-                    return
-            else:
-                if self.gpu_stressor is not None and not self.gpu_stressor.running:
-                    self.root.after(
-                        0, self._finish_due_to_limit,
-                        "Stressor GPU parou antes do tempo."
-                    )
-                    return
+        if mode == "cpu":
+            if max_cpu_temp is not None and max_cpu_temp >= temp_limit:
+                return f"Temperatura CPU limite atingida ({max_cpu_temp:.1f} °C)."
+        else:
+            if gpu_temp is not None and gpu_temp >= temp_limit:
+                return f"Temperatura GPU limite atingida ({gpu_temp:.1f} °C)."
+
+        if mode == "cpu":
+            if self.process and self.process.poll() is not None:
+                return "Processo CPU terminou antes do tempo."
+        else:
+            if self.gpu_stressor is not None and not self.gpu_stressor.running:
+                return "Stressor GPU parou antes do tempo."
+
+        return None
 
     def _finish_due_to_limit(self, reason: str) -> None:
         if not self.running: